@@ -0,0 +1,204 @@
+from __future__ import annotations
+import argparse, csv, io, json, re, sys, tempfile, zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from . import storage
+
+try:
+    import pyarrow as pa  # opcional: exportação em Parquet
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Exportação incremental dos summaries de jobs finalizados: uma linha "total" por job e uma
+# linha "item" por ingrediente, em blocos de CSV/NDJSON (ou row groups Parquet). O cursor é
+# "<updated_at>:<job_id>"; com --name/name o último cursor fica num arquivo de watermark.
+# Memória: o stream lê um summary e monta um bloco por vez, mas o plano (ids ordenados dos jobs
+# novos) vem do index.json, que já é lido inteiro; o custo fixo cresce com o índice, não com os summaries.
+
+EXPORTS_DIR = storage.JOBS_DIR / "exports"
+NUTRIENTS = ["kcal", "protein_g", "fat_g", "carbs_g", "sodium_mg", "fiber_g", "saturated_fat_g", "trans_fat_g", "sugar_g"]
+FIELDS = ["job_id", "created_at", "updated_at", "row_type", "name", "amount_g", "mapping", *NUTRIENTS]
+TOTAL_KEYS = {"kcal": "total_kcal"}
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+DEFAULT_CHUNK = 1000
+OPEN_ARCHIVES = 8  # arquivos diários mantidos abertos durante o stream
+
+Cursor = Tuple[float, str]
+PlanEntry = Tuple[float, str, float, Optional[str]]  # updated_at, job_id, created_at, arquivo diário
+
+def parse_cursor(value: str) -> Cursor:
+    ts, _, job_id = value.partition(":")
+    return float(ts), job_id
+
+def format_cursor(cursor: Cursor) -> str:
+    return f"{float(cursor[0])!r}:{cursor[1]}"  # repr: ida e volta exata do float
+
+def _watermark_path(name: str) -> Path:
+    if not re.fullmatch(r"[\w.-]+", name):
+        raise ValueError(f"nome de export inválido: {name!r}")
+    return EXPORTS_DIR / f"{name}.watermark"
+
+def read_watermark(name: str) -> Cursor:
+    path = _watermark_path(name)
+    if not path.exists():
+        return 0.0, ""
+    return parse_cursor(json.loads(path.read_text(encoding="utf-8"))["cursor"])
+
+def write_watermark(name: str, cursor: Cursor):
+    path = _watermark_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"cursor": format_cursor(cursor)}), encoding="utf-8")
+    tmp.replace(path)
+
+def plan(since: Cursor) -> Tuple[List[PlanEntry], Cursor]:
+    """Jobs done com (updated_at, job_id) > since, em ordem, e o cursor final do export.
+    Cada entrada já traz o arquivo diário do job: o stream não relê o índice por job."""
+    jobs = sorted(
+        (float(e.get("updated_at", 0)), job_id, float(e.get("created_at", 0)), e.get("archive"))
+        for job_id, e in storage.list_jobs().items()
+        if e.get("status") == "done" and (float(e.get("updated_at", 0)), job_id) > since
+    )
+    end = (jobs[-1][0], jobs[-1][1]) if jobs else since
+    return jobs, end
+
+def _iter_summaries(jobs: Iterable[PlanEntry]) -> Iterator[Tuple[PlanEntry, Dict[str, Any]]]:
+    # um summary por vez; arquivos diários ficam abertos (LRU pequeno) em vez de reabertos por job
+    open_zips: "OrderedDict[str, Any]" = OrderedDict()
+    try:
+        for job in jobs:
+            _, job_id, _, archive = job
+            data = None
+            path = storage.result_path(job_id, "summary.json")
+            if path is not None:
+                data = path.read_bytes()
+            elif archive:
+                zf = open_zips.get(archive)
+                if zf is None:
+                    zf = open_zips[archive] = storage.open_archive(archive)
+                    while len(open_zips) > OPEN_ARCHIVES:
+                        old = open_zips.popitem(last=False)[1]
+                        if old is not None:
+                            old.close()
+                open_zips.move_to_end(archive)
+                try:
+                    data = zf.read(f"{job_id}/results/summary.json") if zf is not None else None
+                except (KeyError, zipfile.BadZipFile, OSError):
+                    data = None
+            try:
+                summary = json.loads(data) if data else None
+            except ValueError:
+                summary = None
+            if summary is not None:
+                yield job, summary
+    finally:
+        for zf in open_zips.values():
+            if zf is not None:
+                zf.close()
+
+def iter_rows(jobs: Iterable[PlanEntry]) -> Iterator[Dict[str, Any]]:
+    for (updated_at, job_id, created_at, _), summary in _iter_summaries(jobs):
+        base = {"job_id": job_id, "created_at": created_at, "updated_at": updated_at}
+        items = summary.get("items") or []
+        yield {
+            **base, "row_type": "total", "name": None, "mapping": None,
+            "amount_g": sum(float(it.get("amount_g") or 0.0) for it in items),
+            **{n: float(summary.get(TOTAL_KEYS.get(n, n)) or 0.0) for n in NUTRIENTS},
+        }
+        for it in items:
+            yield {
+                **base, "row_type": "item", "name": it.get("name"), "mapping": it.get("mapping"),
+                "amount_g": float(it.get("amount_g") or 0.0),
+                **{n: float(it.get(n) or 0.0) for n in NUTRIENTS},
+            }
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_csv(rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS)
+    writer.writeheader()
+    yield buf.getvalue().encode("utf-8")
+    for chunk in _chunks(rows, chunk_size):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(chunk)
+        yield buf.getvalue().encode("utf-8")
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK) -> Iterator[bytes]:
+    for chunk in _chunks(rows, chunk_size):
+        yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk).encode("utf-8")
+
+def _parquet_schema():
+    return pa.schema(
+        [("job_id", pa.string()), ("created_at", pa.float64()), ("updated_at", pa.float64()),
+         ("row_type", pa.string()), ("name", pa.string()), ("amount_g", pa.float64()), ("mapping", pa.string())]
+        + [(n, pa.float64()) for n in NUTRIENTS]
+    )
+
+def write_parquet(rows: Iterable[Dict[str, Any]], sink, chunk_size: int = DEFAULT_CHUNK):
+    if pa is None:
+        raise RuntimeError("Exportação em Parquet requer o pacote pyarrow.")
+    schema = _parquet_schema()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK) -> Iterator[bytes]:
+    # o rodapé do Parquet só existe no fim: grava em arquivo temporário e depois transmite
+    with tempfile.TemporaryFile() as tmp:
+        write_parquet(rows, tmp, chunk_size)
+        tmp.seek(0)
+        while block := tmp.read(1 << 20):
+            yield block
+
+def stream(jobs, fmt: str, chunk_size: int = DEFAULT_CHUNK, on_complete: Optional[Callable[[], None]] = None) -> Iterator[bytes]:
+    """Blocos de bytes do export; on_complete (ex.: gravar a watermark) só roda se o stream terminar."""
+    writer = {"csv": iter_csv, "ndjson": iter_ndjson, "parquet": iter_parquet}[fmt]
+    yield from writer(iter_rows(jobs), chunk_size)
+    if on_complete is not None:
+        on_complete()
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Exporta summaries de jobs finalizados (CSV/NDJSON/Parquet).")
+    ap.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    ap.add_argument("--out", type=Path, help="arquivo de saída (padrão: stdout; obrigatório para parquet)")
+    ap.add_argument("--since", help="cursor '<updated_at>:<job_id>' ou timestamp unix")
+    ap.add_argument("--name", help="nome do export incremental (watermark em jobs/exports/<name>.watermark)")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    args = ap.parse_args(argv)
+
+    if args.format == "parquet" and (pa is None or args.out is None):
+        ap.error("parquet requer pyarrow e --out")
+    watermark = read_watermark(args.name) if args.name else (0.0, "")
+    since = parse_cursor(args.since) if args.since else watermark
+    jobs, end = plan(since)
+    done = (lambda: write_watermark(args.name, end)) if args.name else None
+
+    if args.format == "parquet":
+        write_parquet(iter_rows(jobs), str(args.out), args.chunk_size)
+        if done:
+            done()
+    else:
+        out = open(args.out, "wb") if args.out else sys.stdout.buffer
+        try:
+            for block in stream(jobs, args.format, args.chunk_size, done):
+                out.write(block)
+        finally:
+            if args.out:
+                out.close()
+    print(f"{len(jobs)} jobs exportados; cursor: {format_cursor(end)}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from .models import JobCreate, JobStatus
-from . import storage
-from pathlib import Path
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import FileResponse, Response, PlainTextResponse, StreamingResponse
+from .models import JobCreate, JobStatus, IngredientSuggestion, IngredientMatchRequest, IngredientMatch
+from . import storage, scheduling, metrics, exports
+from .pipeline.ingredient_index import get_index
 from fastapi.middleware.cors import CORSMiddleware
-import os, json
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+import mimetypes, os
 
-app = FastAPI(title="Nutri Label Service", version="0.2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        get_index()  # índice de ingredientes montado no startup, não na 1ª requisição
+    except (RuntimeError, OSError, ValueError) as e:
+        # sem as bases a API continua aceitando jobs; só as rotas de ingredientes respondem 503
+        print("Índice de ingredientes indisponível:", e)
+    yield
+
+app = FastAPI(title="Nutri Label Service", version="0.2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,16 +27,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-JOBS_DIR = Path(os.getenv("JOBS_DIR", Path(__file__).resolve().parents[1] / "jobs"))
 storage.ensure_dirs()
-app.mount("/files", StaticFiles(directory=str(JOBS_DIR)), name="files")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Header com o IP real do cliente, definido pelo proxy/CDN confiável (ex.: X-Forwarded-For, CF-Connecting-IP).
+# Sem ele, jobs sem client_id/X-Client-Id não entram nas cotas por cliente: o IP visto seria o do proxy.
+CLIENT_IP_HEADER = os.getenv("CLIENT_IP_HEADER", "").strip().lower()
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in (coding, "*"):
+            q = params.strip()
+            try:
+                return float(q[2:]) > 0 if q.startswith("q=") else True
+            except ValueError:
+                return False
+    return False
+
+def _client_id(payload: dict, request: Request) -> str | None:
+    explicit = payload.get("client_id") or request.headers.get("x-client-id")
+    if explicit:
+        return explicit
+    if CLIENT_IP_HEADER:
+        # X-Forwarded-For: o último endereço é o que o proxy confiável acrescentou
+        forwarded = request.headers.get(CLIENT_IP_HEADER, "").split(",")[-1].strip()
+        return f"ip:{forwarded}" if forwarded else None
+    return None
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or f'"{etag}"' in tags
 
 @app.post("/v1/jobs", response_model=JobStatus)
-def create_job(job: JobCreate):
-    job_id = storage.create_job(job.model_dump())
+def create_job(job: JobCreate, request: Request):
+    payload = job.model_dump()
+    priority = payload.get("priority") or "interactive"
+    client_id = _client_id(payload, request)
+    retry_after = scheduling.admit(priority, client_id, scheduling.queue_stats(storage.list_jobs()))
+    if retry_after is not None:
+        raise HTTPException(429, "Fila cheia, tente novamente mais tarde", headers={"Retry-After": str(int(retry_after))})
+    job_id = storage.create_job(payload, priority=priority, lane=scheduling.lane_for(payload), client_id=client_id)
     status = storage.get_job(job_id)
     return status
 
+def _ingredient_index():
+    try:
+        return get_index()
+    except (RuntimeError, OSError, ValueError) as e:
+        raise HTTPException(503, f"Índice de ingredientes indisponível: {e}")
+
+@app.get("/v1/ingredients/suggest", response_model=List[IngredientSuggestion])
+def suggest_ingredients(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=50)):
+    with metrics.stage("ingredients_suggest"):
+        return _ingredient_index().suggest(q, limit)
+
+@app.post("/v1/ingredients/match", response_model=List[IngredientMatch])
+def match_ingredients(req: IngredientMatchRequest):
+    with metrics.stage("ingredients_match"):
+        return _ingredient_index().match(req.names)
+
+@app.get("/v1/exports")
+def export_summaries(
+    format: Literal["csv", "ndjson", "parquet"] = "ndjson",
+    since: Optional[str] = Query(None, description="cursor '<updated_at>:<job_id>' ou timestamp unix"),
+    name: Optional[str] = Query(None, description="export incremental: usa e avança a watermark com esse nome"),
+    chunk_size: int = Query(exports.DEFAULT_CHUNK, ge=1, le=100000),
+):
+    if format == "parquet" and exports.pa is None:
+        raise HTTPException(400, "Exportação em Parquet requer o pacote pyarrow")
+    try:
+        watermark = exports.read_watermark(name) if name else (0.0, "")
+        cursor = exports.parse_cursor(since) if since else watermark
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    jobs, end = exports.plan(cursor)
+    on_complete = (lambda: exports.write_watermark(name, end)) if name else None
+    return StreamingResponse(
+        exports.stream(jobs, format, chunk_size, on_complete),
+        media_type=exports.FORMATS[format],
+        headers={"X-Export-Cursor": exports.format_cursor(end)},
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    metrics.flush()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/v1/queue")
+def get_queue():
+    return scheduling.queue_stats(storage.list_jobs())
+
 @app.get("/v1/jobs/{job_id}", response_model=JobStatus)
 def get_job(job_id: str):
     status = storage.get_job(job_id)
@@ -41,8 +135,45 @@ def get_job(job_id: str):
     return status
 
 @app.get("/v1/jobs/{job_id}/results/{fname}")
-def get_result_file(job_id: str, fname: str):
-    path = JOBS_DIR / job_id / "results" / fname
-    if not path.exists():
-        raise HTTPException(404, "Result not found")
-    return FileResponse(path)
+@app.get("/files/{job_id}/results/{fname}")
+def get_result_file(job_id: str, fname: str, request: Request):
+    status = storage.get_job(job_id) or {}
+    etags = status.get("etags") or {}
+    media_type = mimetypes.guess_type(fname)[0] or "application/octet-stream"
+    headers = {}
+
+    # summary.json pré-comprimido no worker: escolhe a variante pelo Accept-Encoding
+    served = fname
+    if fname in storage.PRECOMPRESS:
+        headers["Vary"] = "Accept-Encoding"
+        for coding, ext in PRECOMPRESSED:
+            if f"{fname}{ext}" in etags and _accepts(request.headers.get("accept-encoding", ""), coding):
+                served = f"{fname}{ext}"
+                headers["Content-Encoding"] = coding
+                break
+
+    etag = etags.get(served)
+    if status.get("status") == "done":
+        headers["Cache-Control"] = IMMUTABLE
+    # ETag já conhecido pelo status: a revalidação responde 304 sem tocar no disco nem no arquivo
+    if etag is not None:
+        headers["ETag"] = f'"{etag}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+    # jobs em shards (jobs/ab/cd/<uuid>/) ou já compactados em archive/<dia>.zip
+    path = storage.result_path(job_id, served)
+    data = None
+    if path is None:
+        data = storage.read_archived(job_id, f"results/{served}", status.get("created_at"))
+        if data is None:
+            raise HTTPException(404, "Result not found")
+
+    if etag is None:
+        etag = storage.content_etag(data if data is not None else path.read_bytes())
+        headers["ETag"] = f'"{etag}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+    if path is not None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
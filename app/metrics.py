@@ -0,0 +1,169 @@
+from __future__ import annotations
+import contextvars, json, os, time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Tuple
+from .owners import HOST, INSTANCE, owner, owner_alive
+
+# Métricas leves: contadores e histogramas em memória por processo. Cada processo grava
+# periodicamente um snapshot em METRICS_DIR/<host>-<pid>-<instância>.json e o GET /metrics soma todos
+# (no docker-compose API e worker são ambos pid 1 no mesmo volume: o pid sozinho não basta).
+# Com METRICS=0 tudo vira no-op (nem perf_counter é chamado).
+
+ENABLED = os.getenv("METRICS", "1").lower() not in {"0", "false", "no", "off"}
+_JOBS_DIR = Path(os.getenv("JOBS_DIR", Path(__file__).resolve().parents[1] / "jobs"))
+METRICS_DIR = Path(os.getenv("METRICS_DIR", _JOBS_DIR / ".metrics"))
+PREFIX = "nutri_"
+# snapshots de processos em outro host (vida não verificável) sem atualização há mais que isso saem da soma
+STALE_S = float(os.getenv("METRICS_STALE_S", "86400"))
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BUCKETS = {
+    "stage_seconds": SECONDS_BUCKETS,
+    "job_seconds": SECONDS_BUCKETS,
+    "match_score": (50.0, 60.0, 70.0, 80.0, 85.0, 90.0, 95.0, 100.0),
+}
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+_counters: Dict[Key, float] = {}
+_hists: Dict[Key, List[float]] = {}  # contagem por bucket (+Inf no fim), soma, total
+_trace: contextvars.ContextVar[Dict[str, float] | None] = contextvars.ContextVar("trace", default=None)
+
+def _key(name: str, labels: Dict[str, Any]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name: str, value: float = 1.0, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    _counters[k] = _counters.get(k, 0.0) + value
+
+def observe(name: str, value: float, **labels):
+    if not ENABLED:
+        return
+    buckets = BUCKETS.get(name, SECONDS_BUCKETS)
+    k = _key(name, labels)
+    h = _hists.get(k)
+    if h is None:
+        h = _hists[k] = [0.0] * (len(buckets) + 3)
+    i = 0
+    while i < len(buckets) and value > buckets[i]:
+        i += 1
+    h[i] += 1
+    h[-2] += value
+    h[-1] += 1
+
+@contextmanager
+def trace() -> Iterator[Dict[str, float]]:
+    """Coleta as durações dos stages executados dentro do bloco (vai para status.json -> timings)."""
+    timings: Dict[str, float] = {}
+    token = _trace.set(timings)
+    try:
+        yield timings
+    finally:
+        _trace.reset(token)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        observe("stage_seconds", dt, stage=name)
+        timings = _trace.get()
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + dt, 6)
+
+def _snapshot_name() -> str:
+    return f"{HOST}-{os.getpid()}-{INSTANCE}.json"
+
+def _dead(info: Dict[str, Any], mtime: float) -> bool:
+    # mesma regra dos claims de jobs: dono neste host decide pela vida do processo, os demais pela idade
+    alive = owner_alive(info)
+    if alive is not None:
+        return not alive
+    return time.time() - mtime > STALE_S
+
+def _dump() -> Dict[str, Any]:
+    return {
+        "owner": owner(),
+        "counters": [[n, dict(l), v] for (n, l), v in _counters.items()],
+        "histograms": [[n, dict(l), h] for (n, l), h in _hists.items()],
+    }
+
+def flush():
+    if not ENABLED:
+        return
+    try:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        path = METRICS_DIR / _snapshot_name()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_dump()), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def collect() -> Tuple[Dict[Key, float], Dict[Key, List[float]]]:
+    """Soma as métricas deste processo com os snapshots gravados pelos demais."""
+    counters = dict(_counters)
+    hists = {k: list(h) for k, h in _hists.items()}
+    own = _snapshot_name()
+    files = sorted(METRICS_DIR.glob("*.json")) if METRICS_DIR.is_dir() else []
+    for f in files:
+        if f.name == own:
+            continue
+        try:
+            mtime = f.stat().st_mtime
+            data = json.loads(f.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if _dead(data.get("owner") or {}, mtime):
+            f.unlink(missing_ok=True)  # processo encerrado: o snapshot sai da soma
+            continue
+        for n, l, v in data.get("counters", []):
+            k = _key(n, l)
+            counters[k] = counters.get(k, 0.0) + v
+        for n, l, h in data.get("histograms", []):
+            k = _key(n, l)
+            if k not in hists:
+                hists[k] = list(h)
+            elif len(hists[k]) == len(h):
+                hists[k] = [a + b for a, b in zip(hists[k], h)]
+    return counters, hists
+
+def _labels(labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+def render() -> str:
+    """Formato de texto do Prometheus (0.0.4)."""
+    counters, hists = collect()
+    lines: List[str] = []
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (n, l), v in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{n}{_labels(l)} {_num(v)}")
+    for name in sorted({n for n, _ in hists}):
+        buckets = BUCKETS.get(name, SECONDS_BUCKETS)
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (n, l), h in sorted(hists.items()):
+            if n != name:
+                continue
+            acc = 0.0
+            for le, c in zip([*map(str, buckets), "+Inf"], h[:-2]):
+                acc += c
+                le_label = f'le="{le}"'
+                lines.append(f"{PREFIX}{n}_bucket{_labels(l, le_label)} {_num(acc)}")
+            lines.append(f"{PREFIX}{n}_sum{_labels(l)} {_num(h[-2])}")
+            lines.append(f"{PREFIX}{n}_count{_labels(l)} {_num(h[-1])}")
+    return "\n".join(lines) + "\n"
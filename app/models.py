@@ -6,6 +6,9 @@ class JobCreate(BaseModel):
     content: str = Field(..., description="Texto, HTML ou URL dependendo do input_type")
     extractor: Optional[Literal["regex", "llm", "auto"]] = "auto"
     label_format: Optional[Literal["simple", "anvisa"]] = "anvisa"
+    priority: Optional[Literal["interactive", "bulk", "reprocess"]] = "interactive"
+    client_id: Optional[str] = Field(None, description="Identificador do cliente (cotas); padrão: header X-Client-Id ou o IP do header CLIENT_IP_HEADER")
+    profile: Optional[bool] = Field(False, description="Executa o job sob cProfile/tracemalloc e salva os relatórios em results/")
 
 class JobStatus(BaseModel):
     job_id: str
@@ -13,7 +16,12 @@ class JobStatus(BaseModel):
     message: Optional[str] = None
     created_at: float
     updated_at: float
+    started_at: Optional[float] = None
     results: Optional[Dict[str, Any]] = None  # paths relativos quando pronto
+    priority: Optional[str] = None
+    lane: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # segundos por etapa do pipeline
+    attempts: Optional[int] = None  # execuções interrompidas (worker morreu com o job)
 
 class IngredientItem(BaseModel):
     name: str
@@ -39,3 +47,20 @@ class NutritionSummary(BaseModel):
     sodium_mg: float
     per_serving: Optional[Dict[str, float]] = None
     items: List[NutritionItem] = []
+
+class IngredientSuggestion(BaseModel):
+    descricao: str
+    source: Literal["tbca", "densidades"]
+    score: float
+
+class IngredientMatchRequest(BaseModel):
+    names: List[str] = Field(..., max_length=200, description="Nomes de ingredientes como aparecem na receita")
+
+class IngredientMatch(BaseModel):
+    name: str
+    mapping: Optional[str] = None  # descrição TBCA usada no cálculo
+    score: float
+    per_100g: Dict[str, float] = {}
+    density_match: Optional[str] = None
+    density_score: float = 0.0
+    grams_per_unit: Dict[str, float] = {}  # medida caseira -> gramas (densidades ou padrão)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+import os, socket, uuid
+from typing import Dict, Any
+
+# Identidade do processo (host, pid, instância), gravada no .claim dos jobs e nos snapshots de
+# métricas. A instância distingue um processo reiniciado com o mesmo pid (ex.: pid 1 no container).
+
+HOST = socket.gethostname()
+INSTANCE = uuid.uuid4().hex[:8]
+
+def owner() -> Dict[str, Any]:
+    return {"host": HOST, "pid": os.getpid(), "instance": INSTANCE}
+
+def owner_alive(info) -> bool | None:
+    """True/False quando dá para saber (dono neste host); None para donos em outro host ou ilegíveis."""
+    if not isinstance(info, dict) or info.get("host") != HOST:
+        return None
+    if info.get("pid") == os.getpid():
+        return info.get("instance") == INSTANCE
+    try:
+        os.kill(int(info["pid"]), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, de outro usuário
+    except (KeyError, TypeError, ValueError, OSError):
+        return None
+    return True
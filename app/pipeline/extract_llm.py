@@ -3,6 +3,7 @@ from __future__ import annotations
 import os, json, re
 from typing import List, Dict
 from openai import OpenAI
+from .. import metrics
 
 SYSTEM = """Você extrai ingredientes de receitas em português do Brasil.
 Responda APENAS com JSON válido e NADA mais, no formato:
@@ -47,14 +48,19 @@ def extract_with_llm(text: str) -> List[Dict]:
     client = _client()
     prompt = USER_TMPL.format(content=text[:8000])
 
-    resp = client.chat.completions.create(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.1,
-        messages=[
-            {"role": "system", "content": SYSTEM},
-            {"role": "user",   "content": prompt},
-        ],
-    )
+    with metrics.stage("llm"):
+        resp = client.chat.completions.create(
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            temperature=0.1,
+            messages=[
+                {"role": "system", "content": SYSTEM},
+                {"role": "user",   "content": prompt},
+            ],
+        )
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, kind="prompt")
+        metrics.inc("llm_tokens_total", usage.completion_tokens or 0, kind="completion")
     out = resp.choices[0].message.content or ""
     data = _extract_json_block(out)
     items = data.get("items", [])
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import bisect, os, re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List, Set, Tuple
+
+from .nutrition import best_match, CASEIRAS, DEFAULT_UNIT_WEIGHTS
+from .snapshot import load_reference
+from rapidfuzz import fuzz
+
+# Índice em memória para autocomplete e prévia de mapeamento de ingredientes.
+# Sugestões: índice de prefixos por token (lista ordenada + bisect) com fallback por trigramas.
+# Prévia: mesma best_match/limiares de compute_nutrition e to_grams, para bater com o rótulo final.
+
+MATCH_CACHE_SIZE = int(os.getenv("INGREDIENT_MATCH_CACHE_SIZE", "4096"))
+TOKEN_RE = re.compile(r"\w+")
+NUTRIENT_COLS = [
+    "kcal_100g", "protein_g_100g", "fat_g_100g", "carbs_g_100g", "sodium_mg_100g",
+    "fiber_g_100g", "saturated_fat_g_100g", "trans_fat_g_100g", "sugar_g_100g",
+]
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class IngredientIndex:
+    def __init__(self, tbca, dens):
+        self.tbca = tbca
+        self.dens = dens
+        self.tbca_choices: List[str] = tbca["descricao_norm"].tolist()
+        self.tbca_names: List[str] = tbca["descricao"].tolist()
+        self.dens_choices: List[str] = dens["ingrediente_norm"].tolist()
+        self.dens_names: List[str] = dens["ingrediente"].tolist()
+        self.dens_medidas: List[str] = dens["medida_caseira"].tolist()
+        self.dens_gramas: List[float] = [float(g) for g in dens["gramas"].tolist()]
+
+        # entradas sugeríveis: (texto normalizado, texto exibido, origem), sem duplicatas
+        self.entries: List[Tuple[str, str, str]] = []
+        seen = set()
+        for source, norms, names in (("tbca", self.tbca_choices, self.tbca_names), ("densidades", self.dens_choices, self.dens_names)):
+            for norm, name in zip(norms, names):
+                if norm and (source, norm) not in seen:
+                    seen.add((source, norm))
+                    self.entries.append((norm, str(name), source))
+
+        postings: Dict[str, Set[int]] = {}
+        trigrams: Dict[str, Set[int]] = {}
+        for i, (norm, _, _) in enumerate(self.entries):
+            for tok in TOKEN_RE.findall(norm):
+                postings.setdefault(tok, set()).add(i)
+            for g in _trigrams(norm):
+                trigrams.setdefault(g, set()).add(i)
+        self.tokens: List[str] = sorted(postings)
+        self.postings = postings
+        self.trigrams = trigrams
+        self._match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match_uncached)
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        out: Set[int] = set()
+        i = bisect.bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            out |= self.postings[self.tokens[i]]
+            i += 1
+        return out
+
+    def suggest(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        q = q.lower().strip()
+        toks = TOKEN_RE.findall(q)
+        if not toks:
+            return []
+        cands: Set[int] | None = None
+        for tok in toks:
+            hits = self._prefix(tok)
+            cands = hits if cands is None else cands & hits
+            if not cands:
+                break
+        if not cands:
+            counts = Counter(i for g in _trigrams(q) for i in self.trigrams.get(g, ()))
+            cands = {i for i, _ in counts.most_common(200)}
+        scored = sorted(
+            ((fuzz.WRatio(q, self.entries[i][0]), -len(self.entries[i][0]), i) for i in cands),
+            reverse=True,
+        )[:limit]
+        return [
+            {"descricao": self.entries[i][1], "source": self.entries[i][2], "score": float(score)}
+            for score, _, i in scored
+        ]
+
+    def _match_uncached(self, name: str) -> Dict[str, Any]:
+        # mesma normalização de compute_nutrition (TBCA) e to_grams (densidades)
+        target, score = best_match(name.lower(), self.tbca_choices)
+        row = self.tbca_choices.index(target) if target and target in self.tbca_choices else None
+        per_100g = {c: float(self.tbca[c][row]) for c in NUTRIENT_COLS if c in self.tbca.columns} if row is not None else {}
+
+        grams_per_unit = dict(DEFAULT_UNIT_WEIGHTS)
+        dens_target, dens_score = best_match(name.lower().strip(), self.dens_choices) if self.dens_choices else ("", 0.0)
+        dens_name = None
+        if dens_score >= 80:
+            seen = set()
+            for j, ing in enumerate(self.dens_choices):
+                if ing != dens_target:
+                    continue
+                dens_name = dens_name or str(self.dens_names[j])
+                medida = self.dens_medidas[j]
+                if medida in CASEIRAS and medida not in seen:
+                    seen.add(medida)  # to_grams usa a primeira linha da medida
+                    if self.dens_gramas[j] > 0:
+                        grams_per_unit[medida] = self.dens_gramas[j]
+        return {
+            "name": name,
+            "mapping": str(self.tbca_names[row]) if row is not None else None,
+            "score": float(score),
+            "per_100g": per_100g,
+            "density_match": dens_name,
+            "density_score": float(dens_score),
+            "grams_per_unit": grams_per_unit,
+        }
+
+    def match(self, names: List[str]) -> List[Dict[str, Any]]:
+        return [dict(self._match(n)) for n in names]
+
+@lru_cache(maxsize=1)
+def get_index() -> IngredientIndex:
+    tbca, dens = load_reference()
+    return IngredientIndex(tbca, dens)
@@ -1,9 +1,16 @@
 from __future__ import annotations
-import pandas as pd
 from rapidfuzz import process, fuzz
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, TYPE_CHECKING
+from .. import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas só é importado pelos loaders de CSV; o caminho quente (snapshot) não depende dele.
+# compute_nutrition/to_grams aceitam DataFrames ou snapshot.Table (mesma interface de colunas).
 
 def load_tbca(path: str) -> pd.DataFrame:
+    import pandas as pd
     try:
         df = pd.read_csv(path, sep=";", encoding="utf-8", engine="python", na_filter=False)
     except Exception:
@@ -53,10 +60,11 @@ def load_tbca(path: str) -> pd.DataFrame:
     return df
 
 def load_densidades(path: str) -> pd.DataFrame:
+    import pandas as pd
     try:
-        df = pd.read_csv(path, sep=",", encoding="utf-8", na_filter=False)
+        df = pd.read_csv(path, sep=";", encoding="utf-8-sig", na_filter=False)
     except Exception:
-        df = pd.read_csv(path, sep=",", encoding="latin1", na_filter=False)
+        df = pd.read_csv(path, sep=";", encoding="latin1", na_filter=False)
 
     rename_map = {}
     for col in df.columns:
@@ -73,13 +81,16 @@ def load_densidades(path: str) -> pd.DataFrame:
         if c not in df.columns:
             df[c] = "" if c != "gramas" else 0
 
-    df["ingrediente"] = df["ingrediente"].astype(str)
-    df["ingrediente_norm"] = df["ingrediente"].str.lower().str.strip()
-    df["medida_caseira"] = df["medida_caseira"].astype(str).str.lower().str.strip()
-    df["gramas"] = (
-        df["gramas"].astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
-    )
-    df["gramas"] = pd.to_numeric(df["gramas"], errors="coerce").fillna(0.0)
+    df["ingrediente"] = df["ingrediente"].astype(str).str.strip()
+    df = df[df["ingrediente"] != ""].reset_index(drop=True)
+    df["ingrediente_norm"] = df["ingrediente"].str.lower()
+    # medidas do CSV -> códigos de unidade do extrator (ex.: xicara -> xic)
+    df["medida_caseira"] = df["medida_caseira"].astype(str).str.lower().str.strip().replace(MEDIDA_ALIASES)
+    # "150.0" (ponto decimal) ou "1.234,5" (formato brasileiro)
+    gramas = df["gramas"].astype(str).str.strip()
+    br = gramas.str.contains(",", regex=False)
+    gramas = gramas.where(~br, gramas.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    df["gramas"] = pd.to_numeric(gramas, errors="coerce").fillna(0.0)
 
     return df
 
@@ -89,14 +100,16 @@ CASEIRAS = {"xic", "colher_sopa", "colher_cha", "pitada"}
 VOLUME_UNITS = {"ml", "l"} | CASEIRAS
 UNIT_ALIASES = {"unidade": "un", "un": "un"}
 DEFAULT_UNIT_WEIGHTS = {"colher_sopa": 15.0, "colher_cha": 5.0, "xic": 240.0, "pitada": 1.0}
+MEDIDA_ALIASES = {"xicara": "xic", "xícara": "xic"}
 
 def best_match(name: str, choices: List[str]) -> Tuple[str, float]:
-    res = process.extractOne(name, choices, scorer=fuzz.WRatio)
+    with metrics.stage("best_match"):
+        res = process.extractOne(name, choices, scorer=fuzz.WRatio)
     if res:
         return res[0], float(res[1])
     return ("", 0.0)
 
-def to_grams(qty: float, unit: str, name: str, dens_df: pd.DataFrame) -> float:
+def to_grams(qty: float, unit: str, name: str, dens_df) -> float:
     unit = UNIT_ALIASES.get(unit, unit)
     name_norm = name.lower().strip()
 
@@ -104,29 +117,37 @@ def to_grams(qty: float, unit: str, name: str, dens_df: pd.DataFrame) -> float:
         return qty * UNIT_TO_G[unit]
 
     if unit in CASEIRAS and {"ingrediente_norm", "medida_caseira", "gramas"}.issubset(set(dens_df.columns)):
-        if len(dens_df):
-            target, score = best_match(name_norm, dens_df["ingrediente_norm"].tolist())
+        ingredientes = dens_df["ingrediente_norm"].tolist()
+        if ingredientes:
+            target, score = best_match(name_norm, ingredientes)
+            metrics.observe("match_score", score, table="densidades")
         else:
             target, score = ("", 0.0)
         if score >= 80:
-            rows = dens_df[(dens_df["ingrediente_norm"] == target) & (dens_df["medida_caseira"] == unit)]
-            if not rows.empty:
-                grams_per_unit = float(rows.iloc[0]["gramas"])
-                if grams_per_unit > 0:
-                    return qty * grams_per_unit
+            medidas = dens_df["medida_caseira"].tolist()
+            gramas = dens_df["gramas"].tolist()
+            for ing, medida, g in zip(ingredientes, medidas, gramas):
+                if ing == target and medida == unit:
+                    grams_per_unit = float(g)
+                    if grams_per_unit > 0:
+                        return qty * grams_per_unit
+                    break
 
     if unit in {"ml", "l"}:
         ml = qty * UNIT_TO_ML.get(unit, 1.0)
         return ml * 1.0
 
     if unit in CASEIRAS:
+        metrics.inc("fallback_total", path="default_unit_weight")
         ml = qty * DEFAULT_UNIT_WEIGHTS.get(unit, 1.0)
         return ml * 1.0
 
+    metrics.inc("fallback_total", path="default_30g")
     return qty * 30.0
 
-def compute_nutrition(items: List[Dict], tbca_df: pd.DataFrame, dens_df: pd.DataFrame) -> Dict:
+def compute_nutrition(items: List[Dict], tbca_df, dens_df) -> Dict:
     out_items = []
+    choices = tbca_df["descricao_norm"].tolist()
     total_kcal = total_p = total_f = total_c = total_na = 0.0
     total_fib = total_sat = total_trans = total_sug = 0.0
 
@@ -134,17 +155,20 @@ def compute_nutrition(items: List[Dict], tbca_df: pd.DataFrame, dens_df: pd.Data
         name = it["name"]
         grams = to_grams(float(it["quantity"]), it["unit"], name, dens_df)
 
-        target, score = best_match(name.lower(), tbca_df["descricao_norm"].tolist())
+        target, score = best_match(name.lower(), choices)
+        metrics.observe("match_score", score, table="tbca")
         row = None
-        if target and (tbca_df["descricao_norm"] == target).any():
-            row = tbca_df.loc[tbca_df["descricao_norm"] == target].iloc[0]
+        if target and target in choices:
+            row = choices.index(target)
+        else:
+            metrics.inc("fallback_total", path="no_tbca_match")
 
         def get_val(col):
             # Verifica se a coluna existe e se a linha foi encontrada
-            if row is None or col not in row: return 0.0
-            # A verificação de tipo (float(row[col])) é importante para o cálculo, 
+            if row is None or col not in tbca_df.columns: return 0.0
+            # A verificação de tipo (float(...)) é importante para o cálculo, 
             # mas como já fizemos o to_numeric no load_tbca, a conversão deve ser segura.
-            return float(row[col]) * grams / 100
+            return float(tbca_df[col][row]) * grams / 100
 
         # Cálculo dos nutrientes
         kcal = get_val("kcal_100g")
@@ -162,7 +186,7 @@ def compute_nutrition(items: List[Dict], tbca_df: pd.DataFrame, dens_df: pd.Data
         total_kcal += kcal; total_p += p; total_f += f; total_c += c; total_na += na
         total_fib += fib; total_sat += sat; total_trans += trans; total_sug += sug
         out_items.append({
-            "name": name, "amount_g": grams, "mapping": (row["descricao"] if row is not None else None),
+            "name": name, "amount_g": grams, "mapping": (str(tbca_df["descricao"][row]) if row is not None else None),
             "kcal": kcal, "protein_g": p, "fat_g": f, "carbs_g": c, "sodium_mg": na,
             "fiber_g": fib, "saturated_fat_g": sat, "trans_fat_g": trans, "sugar_g": sug # NOVOS CAMPOS
         })
@@ -2,6 +2,7 @@ from __future__ import annotations
 import re, httpx
 from bs4 import BeautifulSoup
 from trafilatura import extract as trafi_extract
+from .. import metrics
 
 def to_plain_text(input_type: str, content: str) -> str:
     t = (input_type or "auto").lower()
@@ -16,10 +17,12 @@ def to_plain_text(input_type: str, content: str) -> str:
             r.raise_for_status()
             txt = trafi_extract(r.text, include_comments=False, include_tables=False) or ""
             if not txt:
+                metrics.inc("fallback_total", path="url_soup_text")
                 soup = BeautifulSoup(r.text, "lxml")
                 txt = soup.get_text(separator=" ", strip=True)
             return txt
         except Exception:
+            metrics.inc("fallback_total", path="url_fetch_failed")
             return content
     if "<html" in content.lower():
         soup = BeautifulSoup(content, "lxml")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import argparse, hashlib, json, os, time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from .. import metrics
+
+# Snapshot binário das bases de referência (TBCA + densidades), já normalizadas.
+# Cada tabela é um array estruturado .npy aberto com mmap somente-leitura: os
+# processos (API e workers) compartilham as mesmas páginas e não importam pandas.
+
+SNAPSHOT_VERSION = 2  # v2: densidades lidas com ';' e medidas normalizadas
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+TBCA_PATH = DATA_DIR / "tbca.csv"
+DENS_PATH = DATA_DIR / "densidades.csv"
+# fora de app/data: no docker-compose app/data é montado do host e esconderia o snapshot da imagem
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", Path(__file__).resolve().parents[2] / "snapshot"))
+MANIFEST = "manifest.json"
+
+TBCA_COLS = [
+    "descricao", "descricao_norm", "kcal_100g", "protein_g_100g", "fat_g_100g", "carbs_g_100g",
+    "sodium_mg_100g", "fiber_g_100g", "saturated_fat_g_100g", "trans_fat_g_100g", "sugar_g_100g",
+]
+DENS_COLS = ["ingrediente", "ingrediente_norm", "medida_caseira", "gramas"]
+
+class Table:
+    """Tabela somente-leitura sobre um array estruturado, com a interface de colunas usada em nutrition."""
+
+    def __init__(self, arr: np.ndarray):
+        self._arr = arr
+        self.columns = list(arr.dtype.names)
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self._arr[col]
+
+    def __len__(self) -> int:
+        return len(self._arr)
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def _to_struct(df, cols: List[str]) -> np.ndarray:
+    from pandas.api.types import is_numeric_dtype
+
+    fields = []
+    for c in cols:
+        if is_numeric_dtype(df[c]):
+            fields.append((c, "<f8"))
+        else:
+            width = max(1, int(df[c].astype(str).str.len().max() or 1))
+            fields.append((c, f"<U{width}"))
+    arr = np.zeros(len(df), dtype=fields)
+    for c in cols:
+        arr[c] = df[c].to_numpy() if is_numeric_dtype(df[c]) else df[c].astype(str).to_numpy()
+    return arr
+
+def build_snapshot(tbca_path: Path = TBCA_PATH, dens_path: Path = DENS_PATH, out_dir: Path = SNAPSHOT_DIR) -> Dict:
+    from .nutrition import load_tbca, load_densidades
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tables = {
+        "tbca": _to_struct(load_tbca(str(tbca_path)), TBCA_COLS),
+        "densidades": _to_struct(load_densidades(str(dens_path)), DENS_COLS),
+    }
+    for name, arr in tables.items():
+        tmp = out_dir / f"{name}.npy.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, arr, allow_pickle=False)
+        os.replace(tmp, out_dir / f"{name}.npy")
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "sources": {"tbca": _sha256(tbca_path), "densidades": _sha256(dens_path)},
+        "rows": {name: int(len(arr)) for name, arr in tables.items()},
+    }
+    tmp = out_dir / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST)
+    return manifest
+
+def load_snapshot(snapshot_dir: Path = SNAPSHOT_DIR, tbca_path: Path | None = None, dens_path: Path | None = None) -> Tuple[Table, Table] | None:
+    """Abre o snapshot via mmap. Retorna None se ausente, de outra versão ou desatualizado em relação aos CSVs informados."""
+    snapshot_dir = Path(snapshot_dir)
+    try:
+        manifest = json.loads((snapshot_dir / MANIFEST).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    sources = manifest.get("sources", {})
+    for name, path in (("tbca", tbca_path), ("densidades", dens_path)):
+        if path is not None and Path(path).exists() and sources.get(name) != _sha256(path):
+            return None
+    try:
+        tbca = np.load(snapshot_dir / "tbca.npy", mmap_mode="r", allow_pickle=False)
+        dens = np.load(snapshot_dir / "densidades.npy", mmap_mode="r", allow_pickle=False)
+    except Exception:
+        return None
+    return Table(tbca), Table(dens)
+
+@lru_cache(maxsize=None)
+def load_reference(tbca_path: Path = TBCA_PATH, dens_path: Path = DENS_PATH, snapshot_dir: Path = SNAPSHOT_DIR):
+    """Bases de referência do processo: snapshot mmap quando disponível, senão os CSVs via pandas."""
+    snap = load_snapshot(snapshot_dir, tbca_path, dens_path)
+    if snap is not None:
+        metrics.inc("reference_loads_total", source="snapshot")
+        return snap
+    if not (Path(tbca_path).exists() and Path(dens_path).exists()):
+        raise RuntimeError("Bases não encontradas em app/data (tbca.csv, densidades.csv).")
+    from .nutrition import load_tbca, load_densidades
+    metrics.inc("reference_loads_total", source="csv")
+    return load_tbca(str(tbca_path)), load_densidades(str(dens_path))
+
+def main():
+    ap = argparse.ArgumentParser(description="Compila tbca.csv/densidades.csv em um snapshot binário (mmap).")
+    ap.add_argument("--tbca", type=Path, default=TBCA_PATH)
+    ap.add_argument("--densidades", type=Path, default=DENS_PATH)
+    ap.add_argument("--out", type=Path, default=SNAPSHOT_DIR)
+    args = ap.parse_args()
+    manifest = build_snapshot(args.tbca, args.densidades, args.out)
+    print(f"Snapshot v{manifest['version']} gravado em {args.out} ({manifest['rows']})")
+
+if __name__ == "__main__":
+    main()
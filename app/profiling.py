@@ -0,0 +1,45 @@
+from __future__ import annotations
+import cProfile, io, os, pstats, random, tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator
+
+# Profiling opcional por job (JobCreate.profile ou amostragem via PROFILE_SAMPLE_RATE).
+# Os artefatos ficam em results/ e são baixados pela rota de resultados.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "40"))
+PROFILE_FILES = {"profile_prof": "profile.prof", "profile_txt": "profile.txt", "profile_memory": "memory.txt"}
+
+def should_profile(payload: Dict[str, Any]) -> bool:
+    if payload.get("profile"):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+@contextmanager
+def profiled(out_dir: Path, top_n: int = PROFILE_TOP_N) -> Iterator[None]:
+    """Executa o bloco sob cProfile e tracemalloc e grava profile.prof, profile.txt e memory.txt."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+
+        prof.dump_stats(str(out_dir / PROFILE_FILES["profile_prof"]))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).strip_dirs().sort_stats("cumulative").print_stats(top_n)
+        (out_dir / PROFILE_FILES["profile_txt"]).write_text(buf.getvalue(), encoding="utf-8")
+
+        lines = [f"peak: {peak / 1024:.1f} KiB", f"current: {current / 1024:.1f} KiB", "", f"top {top_n} allocation sites:"]
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            lines.append(str(stat))
+        (out_dir / PROFILE_FILES["profile_memory"]).write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import heapq, math, os
+from typing import Dict, Any, List, Iterable
+
+# Classes de prioridade com escalonamento justo ponderado (smooth weighted round-robin)
+# e faixas separadas para jobs que dependem do LLM e jobs só de CPU.
+PRIORITIES = ("interactive", "bulk", "reprocess")
+PRIORITY_WEIGHTS = {"interactive": 6, "bulk": 3, "reprocess": 1}
+# fração do limite da fila que cada classe pode ocupar: bulk/reprocess recebem 429 antes
+ADMISSION_SHARE = {"interactive": 1.0, "bulk": 0.5, "reprocess": 0.25}
+LANES = ("cpu", "llm")
+
+QUEUE_MAX_DEPTH = int(os.getenv("QUEUE_MAX_DEPTH", "1000"))
+QUEUE_MAX_WAIT_S = float(os.getenv("QUEUE_MAX_WAIT_S", "600"))
+QUEUE_WORKERS = max(1, int(os.getenv("QUEUE_WORKERS", "1")))
+CLIENT_MAX_QUEUED = int(os.getenv("CLIENT_MAX_QUEUED", "200"))
+CLIENT_MAX_CONCURRENCY = int(os.getenv("CLIENT_MAX_CONCURRENCY", "2"))
+DEFAULT_SERVICE_S = 5.0
+SERVICE_WINDOW = 50
+
+def lane_for(payload: Dict[str, Any]) -> str:
+    mode = (payload.get("extractor") or "auto").lower()
+    if mode == "llm" or (mode == "auto" and os.getenv("OPENAI_API_KEY")):
+        return "llm"
+    return "cpu"
+
+def queue_stats(idx: Dict[str, Any]) -> Dict[str, Any]:
+    """Estatísticas ao vivo da fila a partir do índice de jobs."""
+    stats: Dict[str, Any] = {
+        "queued": 0, "processing": 0,
+        "by_priority": {p: 0 for p in PRIORITIES},
+        "by_lane": {l: 0 for l in LANES},
+        "clients": {},
+    }
+    durations: List[tuple] = []
+    for entry in idx.values():
+        st = entry.get("status")
+        client = entry.get("client_id")
+        if st in ("queued", "processing"):
+            stats[st] += 1
+            if client:
+                c = stats["clients"].setdefault(client, {"queued": 0, "processing": 0})
+                c[st] += 1
+        if st == "queued":
+            prio = entry.get("priority") or "interactive"
+            stats["by_priority"][prio] = stats["by_priority"].get(prio, 0) + 1
+            lane = entry.get("lane") or "cpu"
+            stats["by_lane"][lane] = stats["by_lane"].get(lane, 0) + 1
+        elif st == "done" and entry.get("started_at"):
+            durations.append((entry["updated_at"], entry["updated_at"] - entry["started_at"]))
+
+    recent = heapq.nlargest(SERVICE_WINDOW, durations)
+    avg = sum(d for _, d in recent) / len(recent) if recent else DEFAULT_SERVICE_S
+    stats["avg_service_s"] = round(avg, 3)
+    stats["est_wait_s"] = round(stats["queued"] * avg / QUEUE_WORKERS, 3)
+    return stats
+
+def admit(priority: str, client_id: str | None, stats: Dict[str, Any]) -> float | None:
+    """None se o job pode entrar na fila; senão o Retry-After sugerido, em segundos."""
+    share = ADMISSION_SHARE.get(priority, 1.0)
+    per_job = stats["avg_service_s"] / QUEUE_WORKERS
+    retry = 0.0
+
+    max_depth = QUEUE_MAX_DEPTH * share
+    if stats["queued"] >= max_depth:
+        retry = max(retry, (stats["queued"] - max_depth + 1) * per_job)
+    max_wait = QUEUE_MAX_WAIT_S * share
+    if stats["est_wait_s"] >= max_wait:
+        retry = max(retry, stats["est_wait_s"] - max_wait + per_job)
+    if client_id and CLIENT_MAX_QUEUED:
+        queued = stats["clients"].get(client_id, {}).get("queued", 0)
+        if queued >= CLIENT_MAX_QUEUED:
+            retry = max(retry, (queued - CLIENT_MAX_QUEUED + 1) * per_job)
+    if retry <= 0:
+        return None
+    return max(1.0, math.ceil(retry))
+
+class Scheduler:
+    """Escolhe o próximo job da fila: round-robin ponderado entre prioridades, FIFO dentro de cada
+    classe, restrito às faixas do worker e respeitando a concorrência máxima por cliente."""
+
+    def __init__(self, weights: Dict[str, int] = PRIORITY_WEIGHTS, lanes: Iterable[str] = LANES,
+                 client_max_concurrency: int = CLIENT_MAX_CONCURRENCY):
+        self.weights = dict(weights)
+        self.lanes = set(lanes)
+        self.client_max_concurrency = client_max_concurrency
+        self._current = {p: 0 for p in self.weights}
+
+    def candidates(self, idx: Dict[str, Any]) -> Dict[str, List[str]]:
+        processing: Dict[str, int] = {}
+        for entry in idx.values():
+            if entry.get("status") == "processing" and entry.get("client_id"):
+                processing[entry["client_id"]] = processing.get(entry["client_id"], 0) + 1
+
+        by_prio: Dict[str, List[tuple]] = {p: [] for p in self.weights}
+        for job_id, entry in idx.items():
+            if entry.get("status") != "queued" or (entry.get("lane") or "cpu") not in self.lanes:
+                continue
+            client = entry.get("client_id")
+            if client and self.client_max_concurrency and processing.get(client, 0) >= self.client_max_concurrency:
+                continue
+            prio = entry.get("priority") if entry.get("priority") in self.weights else "interactive"
+            by_prio[prio].append((entry.get("created_at", 0), job_id))
+        return {p: [j for _, j in sorted(jobs)] for p, jobs in by_prio.items()}
+
+    def order(self, idx: Dict[str, Any]) -> List[str]:
+        """Ordem de tentativa para esta rodada (a 1ª posição é a escolha principal)."""
+        queues = self.candidates(idx)
+        active = [p for p in self.weights if queues[p]]
+        if not active:
+            return []
+        total = sum(self.weights[p] for p in active)
+        for p in active:
+            self._current[p] += self.weights[p]
+        best = max(active, key=lambda p: self._current[p])
+        self._current[best] -= total
+        rest = sorted((p for p in active if p != best), key=lambda p: -self._current[p])
+        return [j for p in [best, *rest] for j in queues[p]]
@@ -1,9 +1,47 @@
-import json, time, uuid, os
+import argparse, copy, gzip, hashlib, json, time, uuid, os, shutil, threading, zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from . import metrics
+from .owners import owner, owner_alive
+
+try:
+    import brotli  # opcional: pré-compressão .br do summary.json
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
 
 JOBS_DIR = Path(os.getenv("JOBS_DIR", Path(__file__).resolve().parents[1] / "jobs"))
 INDEX = JOBS_DIR / "index.json"
+ARCHIVE_DIR = JOBS_DIR / "archive"
+
+# Retenção (0 = desativado): idade máxima dos jobs finalizados e orçamento total em disco.
+RETENTION_MAX_AGE_S = float(os.getenv("JOBS_RETENTION_DAYS", "0")) * 86400
+RETENTION_MAX_BYTES = int(float(os.getenv("JOBS_MAX_BYTES", "0")))
+COMPACT_AFTER_S = float(os.getenv("JOBS_COMPACT_AFTER_DAYS", "0")) * 86400
+
+TERMINAL = {"done", "error"}
+
+# Lease do .claim: renovado a cada update_job do worker dono. Claims vencidos (ou de processos
+# mortos no mesmo host) voltam para a fila; após CLAIM_MAX_ATTEMPTS interrupções o job vira erro.
+CLAIM_TIMEOUT_S = float(os.getenv("CLAIM_TIMEOUT_S", "900"))
+CLAIM_MAX_ATTEMPTS = int(os.getenv("CLAIM_MAX_ATTEMPTS", "3"))
+
+# Status finalizados não mudam mais: ficam num LRU em memória e o polling não toca o disco.
+# A retenção roda nos workers: ao remover jobs ela avança a "geração" (mtime de jobs/generation)
+# e os demais processos descartam o cache; o TTL cobre remoções feitas por fora.
+STATUS_CACHE_SIZE = int(os.getenv("STATUS_CACHE_SIZE", "10000"))
+STATUS_CACHE_TTL_S = float(os.getenv("STATUS_CACHE_TTL_S", "300"))
+GENERATION = JOBS_DIR / "generation"
+_status_cache: "OrderedDict[str, tuple]" = OrderedDict()  # job_id -> (guardado em, status)
+_cache_generation: int | None = None
+PRECOMPRESS = {"summary.json"}
 
 def _now() -> float:
     return time.time()
@@ -21,15 +59,113 @@ def _read_index() -> Dict[str, Any]:
         return {}
 
 def _write_index(idx: Dict[str, Any]):
-    INDEX.write_text(json.dumps(idx, ensure_ascii=False, indent=2), encoding="utf-8")
+    # escrita atômica: leitores concorrentes nunca veem um index.json pela metade
+    tmp = INDEX.with_name(f"index.json.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(idx, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, INDEX)
+
+@contextmanager
+def _index_lock():
+    """Serializa o ciclo ler-modificar-gravar do índice entre API e workers."""
+    if fcntl is None:
+        yield
+        return
+    ensure_dirs()
+    with open(JOBS_DIR / "index.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+@contextmanager
+def _maintenance_lock():
+    """Lock exclusivo não bloqueante de compact/retenção: rende False se outro processo já está nele."""
+    if fcntl is None:
+        yield True
+        return
+    ensure_dirs()
+    with open(JOBS_DIR / "maintenance.lock", "a") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _valid_id(job_id: str) -> bool:
+    try:
+        return str(uuid.UUID(job_id)) == job_id
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+def shard_dir(job_id: str) -> Path:
+    # jobs/ab/cd/<uuid>/ — evita milhões de entradas num único diretório
+    return JOBS_DIR / job_id[:2] / job_id[2:4] / job_id
+
+def job_dir(job_id: str) -> Path | None:
+    """Diretório do job no disco (layout em shards ou legado plano), ou None."""
+    if not _valid_id(job_id):
+        return None
+    for d in (shard_dir(job_id), JOBS_DIR / job_id):
+        if d.is_dir():
+            return d
+    return None
+
+def _archive_of(job_id: str) -> Path | None:
+    entry = _read_index().get(job_id) or {}
+    name = entry.get("archive")
+    return ARCHIVE_DIR / name if name else None
+
+def archive_names(day: str) -> List[str]:
+    """Arquivos de um dia: AAAA-MM-DD.zip e as partes AAAA-MM-DD.N.zip, em ordem."""
+    parts = [p.name for p in ARCHIVE_DIR.glob(f"{day}.*.zip") if p.name[len(day) + 1:-4].isdigit()]
+    return [f"{day}.zip", *sorted(parts, key=lambda n: int(n[len(day) + 1:-4]))]
 
-def create_job(payload: Dict[str, Any]) -> str:
+def read_archived(job_id: str, relpath: str, created_at: float | None = None) -> bytes | None:
+    """Lê um arquivo de um job compactado. Com created_at (ex.: do status em cache) o arquivo é achado
+    pelo dia, como _compact o nomeia; sem ele, pelo índice."""
+    if created_at is not None:
+        names = archive_names(_day_of(float(created_at)))
+    else:
+        archive = _archive_of(job_id)
+        names = [archive.name] if archive is not None else []
+    for name in names:
+        try:
+            with zipfile.ZipFile(ARCHIVE_DIR / name) as zf:
+                return zf.read(f"{job_id}/{relpath}")
+        except (KeyError, zipfile.BadZipFile, OSError):
+            continue
+    return None
+
+def open_archive(name: str) -> zipfile.ZipFile | None:
+    """Abre archive/<name> para várias leituras (o chamador fecha); None se ausente ou inválido."""
+    if Path(name).name != name:
+        return None
+    try:
+        return zipfile.ZipFile(ARCHIVE_DIR / name)
+    except (zipfile.BadZipFile, OSError):
+        return None
+
+def result_path(job_id: str, fname: str) -> Path | None:
+    if Path(fname).name != fname or fname in {"", ".", ".."}:
+        return None
+    d = job_dir(job_id)
+    if d is None:
+        return None
+    path = d / "results" / fname
+    return path if path.is_file() else None
+
+def create_job(payload: Dict[str, Any], **meta) -> str:
     ensure_dirs()
     job_id = str(uuid.uuid4())
-    job_dir = JOBS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    d = shard_dir(job_id)
+    d.mkdir(parents=True, exist_ok=True)
 
-    (job_dir / "input.json").write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    (d / "input.json").write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     status = {
         "job_id": job_id,
         "status": "queued",
@@ -37,39 +173,409 @@ def create_job(payload: Dict[str, Any]) -> str:
         "created_at": _now(),
         "updated_at": _now(),
         "results": None,
+        **meta,
     }
-    (job_dir / "status.json").write_text(json.dumps(status, ensure_ascii=False, indent=2), encoding="utf-8")
+    (d / "status.json").write_text(json.dumps(status, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    idx = _read_index()
-    idx[job_id] = status
-    _write_index(idx)
+    with _index_lock():
+        idx = _read_index()
+        idx[job_id] = status
+        _write_index(idx)
     return job_id
 
-def get_job(job_id: str) -> Dict[str, Any] | None:
-    job_dir = JOBS_DIR / job_id
-    if not job_dir.exists():
+def _generation() -> int:
+    try:
+        return GENERATION.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+def _bump_generation():
+    t = time.time_ns()
+    GENERATION.touch()
+    os.utime(GENERATION, ns=(t, t))
+
+def _cached_status(job_id: str) -> Dict[str, Any] | None:
+    global _cache_generation
+    gen = _generation()
+    if gen != _cache_generation:
+        _status_cache.clear()
+        _cache_generation = gen
+    hit = _status_cache.get(job_id)
+    if hit is None:
         return None
+    cached_at, status = hit
+    if STATUS_CACHE_TTL_S and _now() - cached_at > STATUS_CACHE_TTL_S:
+        del _status_cache[job_id]
+        return None
+    _status_cache.move_to_end(job_id)
+    return status
+
+def _cache_status(job_id: str, status: Dict[str, Any] | None):
+    if not STATUS_CACHE_SIZE or not status or status.get("status") not in TERMINAL:
+        return
+    _status_cache[job_id] = (_now(), status)
+    _status_cache.move_to_end(job_id)
+    while len(_status_cache) > STATUS_CACHE_SIZE:
+        _status_cache.popitem(last=False)
+
+def _read_status(job_id: str) -> Dict[str, Any] | None:
+    d = job_dir(job_id)
+    if d is None:
+        if not _valid_id(job_id):
+            return None
+        data = read_archived(job_id, "status.json")
+        return json.loads(data) if data else None
     try:
-        return json.loads((job_dir / "status.json").read_text(encoding="utf-8"))
+        return json.loads((d / "status.json").read_text(encoding="utf-8"))
     except Exception:
         return None
 
-def update_job(job_id: str, **kwargs):
-    job_dir = JOBS_DIR / job_id
-    status_path = job_dir / "status.json"
-    idx = _read_index()
+def get_job(job_id: str) -> Dict[str, Any] | None:
+    status = _cached_status(job_id)
+    if status is not None:
+        metrics.inc("cache_requests_total", cache="status", result="hit")
+    else:
+        metrics.inc("cache_requests_total", cache="status", result="miss")
+        status = _read_status(job_id)
+        _cache_status(job_id, status)
+    return copy.deepcopy(status)
 
-    if not status_path.exists():
+def update_job(job_id: str, **kwargs):
+    d = job_dir(job_id)
+    if d is None or not (d / "status.json").exists():
         return
+    status_path = d / "status.json"
+
+    with _index_lock():
+        idx = _read_index()
+        status = json.loads(status_path.read_text(encoding="utf-8"))
+        status.update(kwargs)
+        status["updated_at"] = _now()
+        status_path.write_text(json.dumps(status, ensure_ascii=False, indent=2), encoding="utf-8")
+        _status_cache.pop(job_id, None)
+        try:
+            os.utime(d / ".claim")  # renova o lease
+        except FileNotFoundError:
+            pass
 
-    status = json.loads(status_path.read_text(encoding="utf-8"))
-    status.update(kwargs)
-    status["updated_at"] = _now()
-    status_path.write_text(json.dumps(status, ensure_ascii=False, indent=2), encoding="utf-8")
+        idx[job_id] = status
+        _write_index(idx)
+
+def seal_results(job_id: str) -> Dict[str, str]:
+    """Pré-comprime os JSONs de resultado e devolve o ETag (hash do conteúdo) de cada arquivo."""
+    d = job_dir(job_id)
+    if d is None or not (d / "results").is_dir():
+        return {}
+    results = d / "results"
+    for name in PRECOMPRESS:
+        src = results / name
+        if not src.is_file():
+            continue
+        data = src.read_bytes()
+        (results / f"{name}.gz").write_bytes(gzip.compress(data, 9, mtime=0))
+        if brotli is not None:
+            (results / f"{name}.br").write_bytes(brotli.compress(data))
+    return {f.name: content_etag(f.read_bytes()) for f in sorted(results.iterdir()) if f.is_file()}
 
-    idx[job_id] = status
-    _write_index(idx)
+def content_etag(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
 
 def list_queued_jobs() -> List[str]:
     idx = _read_index()
     return [k for k,v in idx.items() if v.get("status") == "queued"]
+
+def list_jobs() -> Dict[str, Any]:
+    return _read_index()
+
+def claim_job(job_id: str) -> bool:
+    """Reserva o job para este worker (criação exclusiva de .claim); False se outro worker já o pegou."""
+    d = job_dir(job_id)
+    if d is None:
+        return False
+    try:
+        fd = os.open(d / ".claim", os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.write(fd, json.dumps({**owner(), "claimed_at": _now()}).encode())
+    os.close(fd)
+    return True
+
+def _claim_stale(path: Path, timeout_s: float, now: float) -> bool:
+    # dono vivo no mesmo host nunca perde o job; o lease (mtime) só decide para donos em outro host
+    try:
+        mtime = path.stat().st_mtime
+        info = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        info = None
+    alive = owner_alive(info)
+    if alive is not None:
+        return not alive
+    return now - mtime > timeout_s
+
+@contextmanager
+def claim_heartbeat(job_id: str, interval_s: float | None = None):
+    """Renova o lease do .claim numa thread enquanto o bloco roda (etapas longas de LLM/URL)."""
+    d = job_dir(job_id)
+    interval_s = interval_s or max(1.0, CLAIM_TIMEOUT_S / 3)
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval_s):
+            try:
+                os.utime(d / ".claim")
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=beat, name=f"claim-{job_id[:8]}", daemon=True)
+    if d is not None:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        if thread.is_alive():
+            thread.join()
+
+def release_stale_claims(timeout_s: float = CLAIM_TIMEOUT_S, now: float | None = None) -> List[str]:
+    """Devolve à fila jobs cujo worker morreu (claim de processo inexistente ou lease vencido)."""
+    with _maintenance_lock() as acquired:
+        if not acquired:
+            return []
+        now = now or _now()
+        released: List[str] = []
+        for job_id, entry in list_jobs().items():
+            if entry.get("status") not in ("queued", "processing"):
+                continue
+            d = job_dir(job_id)
+            if d is None:
+                continue
+            claim = d / ".claim"
+            if claim.exists():
+                if not _claim_stale(claim, timeout_s, now):
+                    continue
+            elif entry.get("status") != "processing" or now - float(entry.get("updated_at", now)) <= timeout_s:
+                continue
+            attempts = int(entry.get("attempts") or 0) + 1
+            if attempts >= CLAIM_MAX_ATTEMPTS:
+                update_job(job_id, status="error", attempts=attempts,
+                           message=f"Worker interrompido {attempts} vezes durante o processamento")
+            else:
+                update_job(job_id, status="queued", attempts=attempts, started_at=None,
+                           message="Reenfileirado: o worker anterior não concluiu o job")
+            # status já gravado antes de liberar: nenhum outro worker pega o job no meio do caminho
+            claim.unlink(missing_ok=True)
+            released.append(job_id)
+        return released
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+def _merge_into(src: Path, target: Path) -> bool:
+    """Move para target os arquivos de src que ainda não existem lá (target prevalece em conflitos).
+    True se src ficou vazio e foi removido."""
+    for f in sorted(src.rglob("*"), reverse=True):
+        dest = target / f.relative_to(src)
+        if f.is_file() and not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(f, dest)
+        elif f.is_dir() and not any(f.iterdir()):
+            f.rmdir()
+    if any(src.iterdir()):
+        return False
+    src.rmdir()
+    return True
+
+def migrate_layout() -> Tuple[int, List[str]]:
+    """Move jobs do layout plano legado (jobs/<uuid>/) para jobs/ab/cd/<uuid>/.
+    Só jobs finalizados; se o destino já existe, os arquivos são mesclados. Workers devem estar parados.
+    Devolve (movidos, ids pulados)."""
+    ensure_dirs()
+    moved, skipped = 0, []
+    with _maintenance_lock() as acquired:
+        if not acquired:
+            raise RuntimeError("outra manutenção em andamento (jobs/maintenance.lock)")
+        for d in sorted(JOBS_DIR.iterdir()):
+            if not (d.is_dir() and _valid_id(d.name)):
+                continue
+            try:
+                status = json.loads((d / "status.json").read_text(encoding="utf-8")).get("status")
+            except (OSError, ValueError):
+                status = None
+            if status not in TERMINAL:
+                skipped.append(d.name)  # em andamento: mover dividiria os resultados entre dois caminhos
+                continue
+            target = shard_dir(d.name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.exists():
+                os.replace(d, target)
+            elif not _merge_into(d, target):
+                skipped.append(d.name)
+                continue
+            moved += 1
+    return moved, skipped
+
+def _day_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+def _new_archive_name(day: str) -> str:
+    # arquivos são gravados uma única vez: jobs que finalizam depois vão para partes AAAA-MM-DD.N.zip
+    name, n = f"{day}.zip", 1
+    while (ARCHIVE_DIR / name).exists():
+        name, n = f"{day}.{n}.zip", n + 1
+    return name
+
+def _pack_day(path: Path, job_ids: List[str]) -> List[str]:
+    """Grava um arquivo novo num temporário, valida e o coloca no lugar com os.replace.
+    Devolve os jobs que ficaram completos no arquivo."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    expected: Dict[str, List[str]] = {}
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for job_id in job_ids:
+                d = job_dir(job_id)
+                if d is None:
+                    continue
+                names = expected[job_id] = []
+                for f in sorted(d.rglob("*")):
+                    if not f.is_file() or f.name == ".claim":
+                        continue
+                    arcname = f"{job_id}/{f.relative_to(d).as_posix()}"
+                    names.append(arcname)
+                    zf.write(f, arcname)
+        if not expected:
+            return []
+        with zipfile.ZipFile(tmp) as zf:
+            if zf.testzip() is not None:
+                raise zipfile.BadZipFile(f"arquivo corrompido: {tmp}")
+            present = set(zf.namelist())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return [j for j, names in expected.items() if all(n in present for n in names)]
+
+def compact(older_than_s: float = COMPACT_AFTER_S or 86400, now: float | None = None) -> int:
+    """Empacota jobs finalizados em arquivos diários archive/AAAA-MM-DD.zip, ainda legíveis pela API.
+    Um dia só é empacotado quando termina há mais de older_than_s, de uma vez; jobs desse dia que
+    finalizarem depois vão para uma parte nova. Só um processo compacta por vez; os demais retornam 0."""
+    with _maintenance_lock() as acquired:
+        if not acquired:
+            return 0
+        return _compact(older_than_s, now)
+
+def _compact(older_than_s: float, now: float | None) -> int:
+    now = now or _now()
+    idx = _read_index()
+    by_day: Dict[str, List[str]] = {}
+    for job_id, entry in idx.items():
+        if entry.get("status") not in TERMINAL or entry.get("archive"):
+            continue
+        created = float(entry.get("created_at", now))
+        day_end = (created // 86400 + 1) * 86400  # fim do dia UTC
+        if day_end + older_than_s > now:
+            continue
+        by_day.setdefault(_day_of(created), []).append(job_id)
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    packed: Dict[str, str] = {}
+    for day, job_ids in sorted(by_day.items()):
+        name = _new_archive_name(day)
+        for job_id in _pack_day(ARCHIVE_DIR / name, job_ids):
+            packed[job_id] = name
+
+    # arquivo validado, índice em seguida, remoção por último: um job nunca fica sem localização
+    with _index_lock():
+        idx = _read_index()
+        for job_id, name in packed.items():
+            if job_id in idx:
+                idx[job_id]["archive"] = name
+        _write_index(idx)
+    for job_id in packed:
+        d = job_dir(job_id)
+        if d is not None:
+            shutil.rmtree(d, ignore_errors=True)
+    return len(packed)
+
+def enforce_retention(max_age_s: float = RETENTION_MAX_AGE_S, max_bytes: int = RETENTION_MAX_BYTES, now: float | None = None) -> List[str]:
+    """Remove jobs finalizados por idade e, depois, os mais antigos até caber em max_bytes.
+    Jobs arquivados são removidos por arquivo diário inteiro."""
+    if not max_age_s and not max_bytes:
+        return []
+    with _maintenance_lock() as acquired:
+        if not acquired:
+            return []
+        return _enforce_retention(max_age_s, max_bytes, now)
+
+def _enforce_retention(max_age_s: float, max_bytes: int, now: float | None) -> List[str]:
+    now = now or _now()
+    idx = _read_index()
+
+    # unidades removíveis: (mais recente updated_at, tamanho, caminho, job_ids)
+    units: List[tuple] = []
+    archives: Dict[str, List[str]] = {}
+    for job_id, entry in idx.items():
+        if entry.get("archive"):
+            archives.setdefault(entry["archive"], []).append(job_id)
+        elif entry.get("status") in TERMINAL:
+            d = job_dir(job_id)
+            size = _dir_size(d) if d is not None else 0
+            units.append((float(entry.get("updated_at", 0)), size, d, [job_id]))
+    for name, job_ids in archives.items():
+        path = ARCHIVE_DIR / name
+        size = path.stat().st_size if path.exists() else 0
+        newest = max(float(idx[j].get("updated_at", 0)) for j in job_ids)
+        units.append((newest, size, path, job_ids))
+    units.sort(key=lambda u: u[0])
+
+    total = sum(u[1] for u in units)
+    evict = []
+    for u in units:
+        expired = max_age_s and now - u[0] > max_age_s
+        over = max_bytes and total > max_bytes
+        if not (expired or over):
+            continue
+        evict.append(u)
+        total -= u[1]
+
+    removed: List[str] = [j for _, _, _, job_ids in evict for j in job_ids]
+    with _index_lock():
+        idx = _read_index()
+        for job_id in removed:
+            idx.pop(job_id, None)
+        _write_index(idx)
+    for _, _, path, _ in evict:
+        if path is None:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.exists():
+            path.unlink()
+    if removed:
+        _bump_generation()  # depois da remoção: nenhum processo volta a guardar um status já removido
+    return removed
+
+def main():
+    ap = argparse.ArgumentParser(description="Manutenção do diretório de jobs.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="move jobs do layout plano para shards")
+    p = sub.add_parser("compact", help="empacota jobs finalizados em arquivos diários")
+    p.add_argument("--older-than-days", type=float, default=(COMPACT_AFTER_S / 86400) or 1.0)
+    p = sub.add_parser("expire", help="aplica a política de retenção")
+    p.add_argument("--max-age-days", type=float, default=RETENTION_MAX_AGE_S / 86400)
+    p.add_argument("--max-bytes", type=float, default=RETENTION_MAX_BYTES)
+    args = ap.parse_args()
+
+    if args.cmd == "migrate":
+        moved, skipped = migrate_layout()
+        print(f"{moved} jobs migrados")
+        if skipped:
+            print(f"{len(skipped)} pulados (não finalizados ou com conflito): {', '.join(skipped)}")
+    elif args.cmd == "compact":
+        print(f"{compact(args.older_than_days * 86400)} jobs arquivados")
+    elif args.cmd == "expire":
+        print(f"{len(enforce_retention(args.max_age_days * 86400, int(args.max_bytes)))} jobs removidos")
+
+if __name__ == "__main__":
+    main()
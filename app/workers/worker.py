@@ -1,10 +1,14 @@
 from __future__ import annotations
 import time, json, os
+from contextlib import nullcontext
 from pathlib import Path
-from .. import storage
+from .. import storage, metrics
+from ..scheduling import Scheduler, LANES
+from ..profiling import should_profile, profiled, PROFILE_FILES
 from ..pipeline.parse import to_plain_text
 from ..pipeline.extract import extract as extract_regex
-from ..pipeline.nutrition import load_tbca, load_densidades, compute_nutrition
+from ..pipeline.nutrition import compute_nutrition
+from ..pipeline.snapshot import load_reference
 from ..pipeline.render import render_png, png_to_pdf
 from ..pipeline.render_anvisa import render_anvisa_png
 from ..pipeline.render_anvisa_vector import render_anvisa_vector_pdf
@@ -22,34 +26,59 @@ def choose_extractor(payload: dict):
             from ..pipeline.extract_llm import extract_with_llm
             return lambda txt: extract_with_llm(txt)
         except Exception:
+            metrics.inc("fallback_total", path="llm_unavailable")
             return extract_regex
     if os.getenv("OPENAI_API_KEY"):
         try:
             from ..pipeline.extract_llm import extract_with_llm
             return lambda txt: extract_with_llm(txt)
         except Exception:
-            pass
+            metrics.inc("fallback_total", path="llm_unavailable")
     return extract_regex
 
 def process_job(job_id: str):
-    job_dir = storage.JOBS_DIR / job_id
+    with metrics.trace() as timings:
+        _process_job(job_id, timings)
+
+def _process_job(job_id: str, timings: dict):
+    job_dir = storage.job_dir(job_id)
+    if job_dir is None:
+        raise RuntimeError(f"Job {job_id} não encontrado em {storage.JOBS_DIR}")
     input_payload = json.loads((job_dir / "input.json").read_text(encoding="utf-8"))
-    storage.update_job(job_id, status="processing", message="Parsing input...")
-    text = to_plain_text(input_payload.get("input_type", "auto"), input_payload["content"])
+    storage.update_job(job_id, status="processing", message="Parsing input...", started_at=time.time())
+
+    results_dir = job_dir / "results"
+    profile = should_profile(input_payload)
+    with profiled(results_dir) if profile else nullcontext():
+        _run_pipeline(job_id, input_payload, results_dir)
+
+    with metrics.stage("seal_results"):
+        etags = storage.seal_results(job_id)
+    results = {
+        "summary_json": f"/files/{job_id}/results/summary.json",
+        "label_png": f"/files/{job_id}/results/label.png",
+        "label_pdf": f"/files/{job_id}/results/label.pdf",
+    }
+    if profile:
+        results.update({k: f"/files/{job_id}/results/{fname}" for k, fname in PROFILE_FILES.items()})
+    storage.update_job(job_id, status="done", message="OK", etags=etags, timings=timings or None, results=results)
+
+def _run_pipeline(job_id: str, input_payload: dict, results_dir: Path):
+    with metrics.stage("to_plain_text"):
+        text = to_plain_text(input_payload.get("input_type", "auto"), input_payload["content"])
 
     extractor = choose_extractor(input_payload)
     storage.update_job(job_id, message=f"Extracting ingredients via {'LLM' if extractor!=extract_regex else 'regex'}...")
-    items = extractor(text)
+    with metrics.stage("extract"):
+        items = extractor(text)
 
     storage.update_job(job_id, message="Computing nutrition...")
-    tbca_df = load_tbca(str(TBCA_PATH)) if TBCA_PATH.exists() else None
-    dens_df = load_densidades(str(DENS_PATH)) if DENS_PATH.exists() else None
-    if tbca_df is None or dens_df is None:
-        raise RuntimeError("Bases não encontradas em app/data (tbca.csv, densidades.csv).")
+    with metrics.stage("load_reference"):
+        tbca_df, dens_df = load_reference(TBCA_PATH, DENS_PATH)
 
-    summary = compute_nutrition(items, tbca_df, dens_df)
+    with metrics.stage("compute_nutrition"):
+        summary = compute_nutrition(items, tbca_df, dens_df)
 
-    results_dir = job_dir / "results"
     results_dir.mkdir(parents=True, exist_ok=True)
     (results_dir / "summary.json").write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
 
@@ -57,31 +86,64 @@ def process_job(job_id: str):
     png_path = results_dir / "label.png"
     pdf_path = results_dir / "label.pdf"
     if label_format == "anvisa":
-        render_anvisa_png(summary, png_path)
-        render_anvisa_vector_pdf(summary, str(pdf_path))
+        with metrics.stage("render_png"):
+            render_anvisa_png(summary, png_path)
+        with metrics.stage("render_pdf"):
+            render_anvisa_vector_pdf(summary, str(pdf_path))
     else:
-        render_png(summary, png_path)
-        png_to_pdf(png_path, pdf_path)
+        with metrics.stage("render_png"):
+            render_png(summary, png_path)
+        with metrics.stage("render_pdf"):
+            png_to_pdf(png_path, pdf_path)
 
-    storage.update_job(job_id, status="done", message="OK", results={
-        "summary_json": f"/files/{job_id}/results/summary.json",
-        "label_png": f"/files/{job_id}/results/label.png",
-        "label_pdf": f"/files/{job_id}/results/label.pdf",
-    })
+MAINTENANCE_INTERVAL_S = float(os.getenv("JOBS_MAINTENANCE_INTERVAL_S", "3600"))
+POLL_INTERVAL_S = float(os.getenv("WORKER_POLL_INTERVAL_S", "2"))
+RECLAIM_INTERVAL_S = float(os.getenv("WORKER_RECLAIM_INTERVAL_S", "60"))
+# faixas atendidas por este worker, ex.: WORKER_LANES=cpu para não ficar preso em chamadas ao LLM
+WORKER_LANES = [l.strip() for l in os.getenv("WORKER_LANES", ",".join(LANES)).split(",") if l.strip()]
+
+def maintenance():
+    if storage.COMPACT_AFTER_S:
+        storage.compact(storage.COMPACT_AFTER_S)
+    storage.enforce_retention()
+
+def next_job(scheduler: Scheduler) -> str | None:
+    for job_id in scheduler.order(storage.list_jobs()):
+        if storage.claim_job(job_id):
+            return job_id
+    return None
 
 def main():
-    print("Worker started. Watching for queued jobs...")
+    print(f"Worker started (lanes: {','.join(WORKER_LANES)}). Watching for queued jobs...")
+    scheduler = Scheduler(lanes=WORKER_LANES)
+    last_maintenance = last_reclaim = 0.0
     while True:
+        job_id = None
         try:
-            queued = storage.list_queued_jobs()
-            for job_id in queued:
+            if time.time() - last_maintenance >= MAINTENANCE_INTERVAL_S:
+                last_maintenance = time.time()
+                maintenance()
+            if time.time() - last_reclaim >= RECLAIM_INTERVAL_S:
+                last_reclaim = time.time()
+                for stale in storage.release_stale_claims():
+                    print(f"Job {stale} liberado: worker anterior não concluiu")
+                metrics.flush()  # mantém o snapshot de métricas fresco mesmo sem jobs
+            job_id = next_job(scheduler)
+            if job_id:
+                t0 = time.perf_counter()
                 try:
-                    process_job(job_id)
+                    with storage.claim_heartbeat(job_id):
+                        process_job(job_id)
+                    metrics.inc("jobs_total", status="done")
                 except Exception as e:
+                    metrics.inc("jobs_total", status="error")
                     storage.update_job(job_id, status="error", message=str(e))
+                metrics.observe("job_seconds", time.perf_counter() - t0)
+                metrics.flush()
         except Exception as e:
             print("Worker loop error:", e)
-        time.sleep(2)
+        if not job_id:
+            time.sleep(POLL_INTERVAL_S)
 
 if __name__ == "__main__":
     main()
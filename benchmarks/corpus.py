@@ -0,0 +1,92 @@
+from __future__ import annotations
+import csv, random
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Corpus sintético e determinístico (seed) de receitas: nomes da TBCA e da tabela de densidades,
+# unidades variadas, frações/decimais com vírgula e embrulhos em HTML ou páginas ruidosas.
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "app" / "data"
+
+UNITS = [
+    ("xícara", "xícaras", "xic"),
+    ("colher de sopa", "colheres de sopa", "colher_sopa"),
+    ("colher (de chá)", "colheres (de chá)", "colher_cha"),
+    ("pitada", "pitadas", "pitada"),
+    ("g", "g", "g"),
+    ("kg", "kg", "kg"),
+    ("ml", "ml", "ml"),
+    ("litro", "litros", "l"),
+    ("unidade", "unidades", "un"),
+    ("dente", "dentes", "un"),
+    ("lata", "latas", "un"),
+]
+QUANTITIES = ["1", "2", "3", "4", "1/2", "1/4", "3/4", "1,5", "0,5", "200", "250", "500", "100", "2,25"]
+NOISE = [
+    "Compartilhe esta receita com seus amigos!",
+    "Publicidade",
+    "Receitas relacionadas: bolo de cenoura, pão de queijo, torta de frango",
+    "Avaliação: 4.8 de 5 (1.234 votos)",
+    "Tempo de preparo: 40 minutos | Rendimento: 8 porções",
+    "Modo de preparo: misture tudo e leve ao forno preaquecido a 180 graus.",
+    "Inscreva-se na nossa newsletter",
+]
+
+def _read_column(path: Path, column: str) -> List[str]:
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        return [row[column].strip() for row in csv.DictReader(fh, delimiter=";") if row.get(column, "").strip()]
+
+@lru_cache(maxsize=None)
+def ingredient_names() -> List[str]:
+    names = set()
+    for nome in _read_column(DATA_DIR / "tbca.csv", "nome"):
+        names.add(nome.split(",")[0].strip().lower())
+    for ing in _read_column(DATA_DIR / "densidades.csv", "ingrediente"):
+        names.add(ing.lower())
+    return sorted(n for n in names if n)
+
+def _qty_value(qty: str) -> float:
+    if "/" in qty:
+        num, den = qty.split("/")
+        return float(num) / float(den)
+    return float(qty.replace(",", "."))
+
+def _line(rng: random.Random, name: str) -> tuple:
+    qty = rng.choice(QUANTITIES)
+    singular, plural, code = rng.choice(UNITS)
+    unit = singular if qty in {"1", "1/2", "1/4", "3/4", "0,5"} else plural
+    sep = rng.choice([" de ", " ", " de ", " "])
+    return f"{qty} {unit}{sep}{name}".strip(), {"name": name, "quantity": _qty_value(qty), "unit": code}
+
+def _html(rng: random.Random, title: str, lines: List[str]) -> str:
+    noise = "".join(f"<div class='ad'>{rng.choice(NOISE)}</div>" for _ in range(rng.randint(2, 6)))
+    items = "".join(f"<li>{ln}</li>" for ln in lines)
+    return (
+        f"<html><head><title>{title}</title><script>var x = 1;</script></head><body>"
+        f"<nav><a href='/'>Início</a> | <a href='/receitas'>Receitas</a></nav>{noise}"
+        f"<article><h1>{title}</h1><h2>Ingredientes</h2><ul>{items}</ul>"
+        f"<h2>Modo de preparo</h2><p>{rng.choice(NOISE)}</p></article>"
+        f"<footer>{rng.choice(NOISE)}</footer></body></html>"
+    )
+
+def generate_recipe(rng: random.Random, min_lines: int = 4, max_lines: int = 20) -> Dict[str, Any]:
+    names = ingredient_names()
+    pairs = [_line(rng, rng.choice(names)) for _ in range(rng.randint(min_lines, max_lines))]
+    lines = [ln for ln, _ in pairs]
+    title = f"Receita de {rng.choice(names)}"
+    noisy = list(lines)
+    for _ in range(rng.randint(1, 4)):
+        noisy.insert(rng.randint(0, len(noisy)), rng.choice(NOISE))
+    return {
+        "title": title,
+        "lines": lines,
+        "items": [it for _, it in pairs],  # gabarito estruturado (nome, quantidade, unidade normalizada)
+        "text": "\n".join(lines),
+        "noisy_text": "\n".join([title, *noisy]),
+        "html": _html(rng, title, lines),
+    }
+
+def generate_corpus(n: int = 50, seed: int = 42, **kwargs) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [generate_recipe(rng, **kwargs) for _ in range(n)]
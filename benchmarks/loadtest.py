@@ -0,0 +1,252 @@
+from __future__ import annotations
+import argparse, json, os, random, re, socket, subprocess, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import httpx
+
+# Teste de carga ponta a ponta, 100% offline: sobe a API (uvicorn app.main:app) e N workers
+# sobre um JOBS_DIR temporário, um endpoint falso compatível com a OpenAI (latência configurável)
+# e um "site de receitas" local para entradas do tipo url. Reproduz uma mistura de jobs numa
+# taxa alvo e reporta throughput, espera na fila e latências p50/p95/p99 de criação -> done.
+#
+#   python -m benchmarks.loadtest --workers 4 --rate 5 --duration 30 --mix text:regex=3,html:regex=2,url:regex=1,text:llm=1
+
+ROOT = Path(__file__).resolve().parents[1]
+INPUT_TYPES = {"text", "html", "url"}
+EXTRACTORS = {"regex", "llm"}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _serve(handler_cls, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def fake_llm_server(port: int, latency_s: float, jitter_s: float) -> ThreadingHTTPServer:
+    """POST /v1/chat/completions no formato da OpenAI; extrai itens com o extrator regex do próprio app."""
+    from app.pipeline.extract import extract
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+            prompt = (body.get("messages") or [{}])[-1].get("content", "")
+            m = re.search(r"```\n(.*)\n```", prompt, flags=re.S)
+            items = extract(m.group(1) if m else prompt)
+            time.sleep(max(0.0, random.gauss(latency_s, jitter_s)))
+            content = json.dumps({"items": items}, ensure_ascii=False)
+            resp = {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(prompt) + len(content)) // 4},
+            }
+            data = json.dumps(resp).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return _serve(Handler, port)
+
+def recipe_site_server(port: int, pages: List[str]) -> ThreadingHTTPServer:
+    """GET /receita/<n> devolve uma página HTML do corpus sintético."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            m = re.fullmatch(r"/receita/(\d+)", self.path)
+            if not m or int(m.group(1)) >= len(pages):
+                self.send_error(404)
+                return
+            data = pages[int(m.group(1))].encode()
+            self.send_response(200)
+            self.send_header("content-type", "text/html; charset=utf-8")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return _serve(Handler, port)
+
+def parse_mix(spec: str) -> List[Tuple[str, str, float]]:
+    mix = []
+    for part in spec.split(","):
+        kind, _, weight = part.strip().partition("=")
+        input_type, _, extractor = kind.partition(":")
+        if input_type not in INPUT_TYPES or (extractor or "regex") not in EXTRACTORS:
+            raise ValueError(f"mix inválido: {part!r}")
+        mix.append((input_type, extractor or "regex", float(weight or 1)))
+    return mix
+
+def _percentiles(values: List[float]) -> Dict[str, float | None]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    vs = sorted(values)
+    pick = lambda q: vs[min(len(vs) - 1, max(0, int(round(q * len(vs))) - 1))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": vs[-1]}
+
+def _wait_ready(api: str, timeout_s: float = 30.0):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{api}/v1/queue", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API não respondeu a tempo")
+
+def run(args) -> Dict[str, Any]:
+    from benchmarks.corpus import generate_corpus
+
+    rng = random.Random(args.seed)
+    corpus = generate_corpus(args.recipes, args.seed)
+    mix = parse_mix(args.mix)
+    jobs_dir = Path(args.jobs_dir or tempfile.mkdtemp(prefix="nutri-load-"))
+    llm_port, site_port, api_port = _free_port(), _free_port(), _free_port()
+    servers = [
+        fake_llm_server(llm_port, args.llm_latency, args.llm_jitter),
+        recipe_site_server(site_port, [r["html"] for r in corpus]),
+    ]
+    env = {
+        **os.environ,
+        "JOBS_DIR": str(jobs_dir),
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "QUEUE_WORKERS": str(args.workers),
+        "QUEUE_MAX_DEPTH": str(args.max_depth),
+        "QUEUE_MAX_WAIT_S": str(args.max_wait),
+        "CLIENT_MAX_QUEUED": "0",
+        "CLIENT_MAX_CONCURRENCY": "0",
+        "WORKER_POLL_INTERVAL_S": str(args.poll),
+        "PYTHONPATH": str(ROOT),
+    }
+    procs = [subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )]
+    api = f"http://127.0.0.1:{api_port}"
+    try:
+        _wait_ready(api)
+        procs += [subprocess.Popen([sys.executable, "-m", "app.workers.worker"], cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL) for _ in range(args.workers)]
+
+        kinds = [(t, e) for t, e, _ in mix]
+        weights = [w for _, _, w in mix]
+        submitted: Dict[str, Dict[str, Any]] = {}
+        rejected = failed = 0
+        total = int(args.rate * args.duration)
+        t_start = time.time()
+        with httpx.Client(base_url=api, timeout=10) as client:
+            for i in range(total):
+                delay = t_start + i / args.rate - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                input_type, extractor = rng.choices(kinds, weights)[0]
+                n = rng.randrange(len(corpus))
+                content = {
+                    "text": corpus[n]["noisy_text"],
+                    "html": corpus[n]["html"],
+                    "url": f"http://127.0.0.1:{site_port}/receita/{n}",
+                }[input_type]
+                payload = {"input_type": input_type, "content": content, "extractor": extractor,
+                           "label_format": "anvisa", "client_id": f"load-{i % 8}"}
+                try:
+                    r = client.post("/v1/jobs", json=payload)
+                except httpx.HTTPError:
+                    failed += 1
+                    continue
+                if r.status_code == 429:
+                    rejected += 1
+                elif r.status_code == 200:
+                    submitted[r.json()["job_id"]] = {"kind": f"{input_type}:{extractor}"}
+                else:
+                    failed += 1
+            submit_s = time.time() - t_start
+
+            pending = set(submitted)
+            deadline = time.time() + args.timeout
+            while pending and time.time() < deadline:
+                for job_id in list(pending):
+                    st = client.get(f"/v1/jobs/{job_id}").json()
+                    if st.get("status") in ("done", "error"):
+                        submitted[job_id].update(st)
+                        pending.discard(job_id)
+                if pending:
+                    time.sleep(0.25)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        for s in servers:
+            s.shutdown()
+
+    finished = [j for j in submitted.values() if j.get("status") in ("done", "error")]
+    done = [j for j in finished if j["status"] == "done"]
+    latency = [j["updated_at"] - j["created_at"] for j in done]
+    wait = [j["started_at"] - j["created_at"] for j in finished if j.get("started_at")]
+    span = (max(j["updated_at"] for j in done) - min(j["created_at"] for j in done)) if done else 0.0
+    by_kind = {}
+    for kind in sorted({j["kind"] for j in submitted.values()}):
+        ks = [j for j in done if j["kind"] == kind]
+        by_kind[kind] = {"done": len(ks), "latency_s": _percentiles([j["updated_at"] - j["created_at"] for j in ks])}
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "jobs_dir": str(jobs_dir),
+        "submitted": len(submitted) + rejected + failed,
+        "accepted": len(submitted),
+        "rejected_429": rejected,
+        "submit_errors": failed,
+        "done": len(done),
+        "errors": len(finished) - len(done),
+        "timed_out": len(submitted) - len(finished),
+        "offered_rate_per_s": total / submit_s if submit_s else None,
+        "throughput_per_s": len(done) / span if span else None,
+        "queue_wait_s": _percentiles(wait),
+        "latency_s": _percentiles(latency),
+        "by_kind": by_kind,
+    }
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Teste de carga offline da API + workers.")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--rate", type=float, default=2.0, help="jobs por segundo")
+    ap.add_argument("--duration", type=float, default=20.0, help="segundos de envio")
+    ap.add_argument("--mix", default="text:regex=3,html:regex=2,url:regex=1,text:llm=1")
+    ap.add_argument("--llm-latency", type=float, default=0.8, help="latência média do LLM falso (s)")
+    ap.add_argument("--llm-jitter", type=float, default=0.2)
+    ap.add_argument("--recipes", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--poll", type=float, default=0.1, help="WORKER_POLL_INTERVAL_S dos workers")
+    ap.add_argument("--max-depth", type=int, default=100000, help="QUEUE_MAX_DEPTH da API")
+    ap.add_argument("--max-wait", type=float, default=1e9, help="QUEUE_MAX_WAIT_S da API")
+    ap.add_argument("--timeout", type=float, default=300.0, help="espera máxima pelos jobs após o envio (s)")
+    ap.add_argument("--jobs-dir", help="JOBS_DIR (padrão: diretório temporário)")
+    ap.add_argument("--out", type=Path, help="grava o relatório em JSON")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)
+    return 0 if report["timed_out"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+from __future__ import annotations
+import argparse, json, os, platform, statistics, sys, tempfile, time
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+# Microbenchmarks por etapa do pipeline + throughput ponta a ponta de process_job.
+#   python -m benchmarks.run --out bench.json
+#   python -m benchmarks.run --out new.json --compare bench.json --threshold 15
+# O modo de comparação sai com código 1 se a mediana de alguma etapa piorar além do limite.
+
+BENCHES: Dict[str, Callable[[Dict[str, Any]], Callable[[], int]]] = {}
+
+def bench(name: str):
+    def deco(fn):
+        BENCHES[name] = fn
+        return fn
+    return deco
+
+def _stats(samples: List[float], ops: int) -> Dict[str, float]:
+    per_op = sorted(s / ops for s in samples)
+    return {
+        "median_s": statistics.median(per_op),
+        "mean_s": statistics.fmean(per_op),
+        "p95_s": per_op[min(len(per_op) - 1, int(len(per_op) * 0.95))],
+        "min_s": per_op[0],
+        "ops_per_round": ops,
+        "rounds": len(per_op),
+    }
+
+def _measure(round_fn: Callable[[], int], rounds: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        round_fn()
+    samples, ops = [], 1
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        ops = round_fn()
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples, max(ops, 1))
+
+def _fixtures(recipes: int, seed: int) -> Dict[str, Any]:
+    from benchmarks.corpus import generate_corpus
+    from app.pipeline.snapshot import load_reference
+    from app.pipeline.nutrition import compute_nutrition
+
+    corpus = generate_corpus(recipes, seed)
+    tbca, dens = load_reference()
+    items = [r["items"] for r in corpus]
+    summaries = [compute_nutrition(it, tbca, dens) for it in items]
+    return {
+        "corpus": corpus, "tbca": tbca, "dens": dens, "items": items, "summaries": summaries,
+        "tmp": Path(tempfile.mkdtemp(prefix="nutri-bench-")),
+    }
+
+@bench("extract.extract")
+def _b_extract(fx):
+    from app.pipeline.extract import extract
+    texts = [r["noisy_text"] for r in fx["corpus"]]
+    def run():
+        for t in texts:
+            extract(t)
+        return len(texts)
+    return run
+
+@bench("parse.to_plain_text")
+def _b_parse(fx):
+    from app.pipeline.parse import to_plain_text
+    pages = [r["html"] for r in fx["corpus"]]
+    def run():
+        for p in pages:
+            to_plain_text("html", p)
+        return len(pages)
+    return run
+
+@bench("nutrition.best_match")
+def _b_best_match(fx):
+    from app.pipeline.nutrition import best_match
+    choices = fx["tbca"]["descricao_norm"].tolist()
+    names = [it["name"].lower() for items in fx["items"] for it in items]
+    def run():
+        for n in names:
+            best_match(n, choices)
+        return len(names)
+    return run
+
+@bench("nutrition.to_grams")
+def _b_to_grams(fx):
+    from app.pipeline.nutrition import to_grams
+    dens = fx["dens"]
+    args = [(it["quantity"], it["unit"], it["name"]) for items in fx["items"] for it in items]
+    def run():
+        for qty, unit, name in args:
+            to_grams(qty, unit, name, dens)
+        return len(args)
+    return run
+
+@bench("nutrition.compute_nutrition")
+def _b_compute(fx):
+    from app.pipeline.nutrition import compute_nutrition
+    def run():
+        for items in fx["items"]:
+            compute_nutrition(items, fx["tbca"], fx["dens"])
+        return len(fx["items"])
+    return run
+
+@bench("render_anvisa_png")
+def _b_png(fx):
+    from app.pipeline.render_anvisa import render_anvisa_png
+    out = fx["tmp"] / "label.png"
+    summaries = fx["summaries"][:10]
+    def run():
+        for s in summaries:
+            render_anvisa_png(s, out)
+        return len(summaries)
+    return run
+
+@bench("render_anvisa_vector_pdf")
+def _b_pdf(fx):
+    from app.pipeline.render_anvisa_vector import render_anvisa_vector_pdf
+    out = str(fx["tmp"] / "label.pdf")
+    summaries = fx["summaries"][:10]
+    def run():
+        for s in summaries:
+            render_anvisa_vector_pdf(s, out)
+        return len(summaries)
+    return run
+
+@bench("worker.process_job")
+def _b_process_job(fx):
+    from app import storage
+    from app.workers.worker import process_job
+    corpus = fx["corpus"][:10]
+    def run():
+        ids = [storage.create_job({"input_type": "text", "content": r["text"], "extractor": "regex"}) for r in corpus]
+        for job_id in ids:
+            process_job(job_id)
+        return len(ids)
+    return run
+
+def run_benchmarks(names: List[str], recipes: int, seed: int, rounds: int) -> Dict[str, Any]:
+    fx = _fixtures(recipes, seed)
+    results = {}
+    for name in names:
+        stats = _measure(BENCHES[name](fx), rounds)
+        results[name] = stats
+        print(f"{name:32s} median {stats['median_s'] * 1e6:11.1f} µs/op  p95 {stats['p95_s'] * 1e6:11.1f} µs/op", file=sys.stderr)
+    e2e = results.get("worker.process_job")
+    return {
+        "meta": {
+            "created_at": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+            "seed": seed, "recipes": recipes, "rounds": rounds,
+            "process_job_per_s": (1.0 / e2e["median_s"]) if e2e else None,
+        },
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float) -> List[str]:
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or base["median_s"] <= 0:
+            continue
+        delta = (cur["median_s"] - base["median_s"]) / base["median_s"] * 100.0
+        flag = "REGRESSION" if delta > threshold_pct else ""
+        print(f"{name:32s} {base['median_s'] * 1e6:11.1f} -> {cur['median_s'] * 1e6:11.1f} µs/op  {delta:+7.1f}% {flag}", file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks do pipeline de rótulos nutricionais.")
+    ap.add_argument("--out", type=Path, help="grava os resultados em JSON")
+    ap.add_argument("--only", help="lista de benchmarks separados por vírgula")
+    ap.add_argument("--recipes", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--compare", type=Path, help="JSON de baseline para comparação")
+    ap.add_argument("--threshold", type=float, default=10.0, help="regressão máxima tolerada da mediana, em %%")
+    ap.add_argument("--jobs-dir", type=Path, help="JOBS_DIR dos jobs de benchmark (padrão: diretório temporário novo)")
+    ap.add_argument("--list", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHES))
+        return 0
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHES)
+    unknown = [n for n in names if n not in BENCHES]
+    if unknown:
+        ap.error(f"benchmarks desconhecidos: {', '.join(unknown)}")
+
+    # process_job grava jobs e métricas: isola num JOBS_DIR próprio antes de importar app.*,
+    # mesmo com JOBS_DIR exportado (workers reais pegariam os jobs do benchmark na fila)
+    jobs_dir = args.jobs_dir or Path(tempfile.mkdtemp(prefix="nutri-bench-jobs-"))
+    os.environ["JOBS_DIR"] = str(jobs_dir)
+    os.environ["METRICS_DIR"] = str(jobs_dir / ".metrics")
+    os.environ.setdefault("METRICS", "0")
+    report = run_benchmarks(names, args.recipes, args.seed, args.rounds)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressões acima de {args.threshold:.1f}%: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())